@@ -4,6 +4,7 @@ setup(
     name='table',
     version='1.0',
     py_modules=['table'],
+    python_requires='>=3.8',
     include_package_data=True,
     install_requires=[
         'click',
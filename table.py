@@ -1,21 +1,31 @@
 #!/usr/bin/python3
 import ast
-import functools
 import json
 import math
 import operator
-from typing import Dict, List, TextIO, Optional
+import os
+import shutil
+import sys
+from string import ascii_uppercase
+from typing import (Dict, Iterable, List, Optional, Sequence, TextIO,
+                    Tuple)
 
 import click
 
+try:
+    # orjson is an optional, faster drop-in for loading json data sets
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 #: Demo data set 1
 PERFORMANCE = ("Performance in requests per second", [
     "Computer", "LPOP", "SADD", "LPUSH", "GET", "SET"
 ], {
-    "A": [415742.52, 342444.95, 306472, 416612.54, 322154.33],
-    "B": [1253954.38, 958227.51, 925685.69, 1202972.44, 884748.25],
-    "C": [1365233.67, 1017367.58, 963456.75, 1159709.04, 916889.68],
-    "D": [415742.52, 342494.98, 306477.42, 416612.54, 322154.54]
+    "A": (415742.52, 342444.95, 306472, 416612.54, 322154.33),
+    "B": (1253954.38, 958227.51, 925685.69, 1202972.44, 884748.25),
+    "C": (1365233.67, 1017367.58, 963456.75, 1159709.04, 916889.68),
+    "D": (415742.52, 342494.98, 306477.42, 416612.54, 322154.54)
 }, "HIB")
 
 #: Demo data set 2
@@ -23,10 +33,10 @@ TIME = ("Time of execution in seconds", [
     "Computer", "mafft", "mrbayes", "build-mplayer", "build-php",
     "compress-gzip", "dcraw", "encode-flac", "gnupg"
 ], {
-    "A": [18.95, 42.51, 163.14, 87.3, 22.06, 109.64, 13.86, 14.79],
-    "B": [20.81, 49.69, 287.17, 461.28, 19.47, 92.81, 10.68, 28.27],
-    "C": [15.2, 800.96, 3.89, 289.57, 16.69, 76.23, 9.34, 17.34],
-    "D": [37.45, 50.81, 751.93, 757.42, 33.53, 100.75, 29.2, 15.32]
+    "A": (18.95, 42.51, 163.14, 87.3, 22.06, 109.64, 13.86, 14.79),
+    "B": (20.81, 49.69, 287.17, 461.28, 19.47, 92.81, 10.68, 28.27),
+    "C": (15.2, 800.96, 3.89, 289.57, 16.69, 76.23, 9.34, 17.34),
+    "D": (37.45, 50.81, 751.93, 757.42, 33.53, 100.75, 29.2, 15.32)
 }, "LIB")
 
 
@@ -69,11 +79,11 @@ class BenchmarkTable:
             elif demo == "p":
                 data_set = PERFORMANCE
         elif input_file:
-            extension = input_file.split('.')[-1].lower()
-            if extension == "json":
-                with open(input_file) as data:
-                    data_set = tuple(json.load(data))
-            elif extension == "py":
+            extension = os.path.splitext(input_file)[1].lower()
+            if extension == ".json":
+                with open(input_file, 'rb') as data:
+                    data_set = tuple(json_loads(data.read()))
+            elif extension == ".py":
                 try:
                     with open(input_file) as data:
                         data_set = ast.literal_eval(data.read())
@@ -98,12 +108,34 @@ class BenchmarkTable:
             output: Optional output file.
         """
         # Set output to either stdout or the output file if there is one
-        writer = compose(output.write, lambda s: s + "\n") if output else print
+        stream = output if output else sys.stdout
+        stream.write(
+            str.join('\n', self._table_lines(items.items())) + "\n")
+
+    def _table_lines(self,
+                     rows: Iterable[Tuple[str, Sequence[float]]]) -> List[str]:
+        """Returns the lines of the markdown table for a data set.
 
-        writer(f"| {str.join(' | ', self.headers)} |")
-        writer(f"| {str.join(' | ', [':---:' for _ in self.headers])} |")
-        for k, v in items.items():
-            writer(f"| {k} {('| %.2f ' * len(v)) % tuple(v)} |")
+        Args:
+            rows: Pairs of computers and their scores, in table order.
+
+        Returns:
+            The header, separator and data rows of the table.
+        """
+        separators = [':---:'] * len(self.headers)
+        lines = [
+            f"| {str.join(' | ', self.headers)} |",
+            f"| {str.join(' | ', separators)} |"
+        ]
+        # Row templates are built once for every row width in the table
+        templates = {}
+        for k, v in rows:
+            template = templates.get(len(v))
+            if template is None:
+                template = "| {} " + "| {:.2f} " * len(v) + " |"
+                templates[len(v)] = template
+            lines.append(template.format(k, *v))
+        return lines
 
     def compared_to(self, ref_machine: str) -> Dict[str, List[float]]:
         """Returns a normalized version of `self.data` with respect to a
@@ -116,20 +148,33 @@ class BenchmarkTable:
             A dictionary that maps computers to the list of their normalized
             results with respect to `ref_machine`
         """
-        result = {}
-        for k, v in self.data.items():
-            normalized = []
-            if self.type == "LIB":
-                for i, m in enumerate(v):
-                    normalized.append(self.data[ref_machine][i] / m)
-            elif self.type == "HIB":
-                for i, m in enumerate(v):
-                    normalized.append(m / self.data[ref_machine][i])
-            else:
-                print("ERROR: INVALID CONFIGURATION!")
-                exit(1)
-            result[k] = normalized
-        return result
+        normalized = self._normalized(self.data[ref_machine],
+                                      self.data.values())
+        return dict(zip(self.data, normalized))
+
+    def _normalized(self,
+                    ref_row: Sequence[float],
+                    rows: Iterable[Sequence[float]]) -> List[List[float]]:
+        """Returns a list of rows normalized with respect to a reference row
+
+        Args:
+            ref_row: the results of the machine we use as reference
+            rows: the results of every computer
+
+        Returns:
+            The normalized results of every computer, in the same order as
+            `rows`
+        """
+        if self.type == "LIB":
+            normalized = (map(operator.truediv, ref_row, row)
+                          for row in rows)
+        elif self.type == "HIB":
+            normalized = (map(operator.truediv, row, ref_row)
+                          for row in rows)
+        else:
+            print("ERROR: INVALID CONFIGURATION!")
+            exit(1)
+        return [list(row) for row in normalized]
 
     def print_markdown(self, output: Optional[TextIO] = None):
         """Prints markdown tables with that compare all the machines
@@ -138,47 +183,64 @@ class BenchmarkTable:
         Args:
             output: Optional output file.
         """
-        # Set output to either stdout or the output file if there is one
-        writer = compose(output.write, lambda s: s + "\n") if output else print
+        # Take a row-major copy of the scores so the loops below don't need
+        # to go through the dictionary for every data point
+        machines = tuple(self.data)
+        matrix = tuple(tuple(map(float, self.data[m])) for m in machines)
+
+        # The whole document is collected first and written all at once
+        lines = []
 
         # Document title
-        writer(f"# {self.title}")
+        lines.append(f"# {self.title}")
 
         # Start by showing the data
-        writer("\nWe have the following data:\n")
-        self.print_table(self.data, output)
+        lines.append("\nWe have the following data:\n")
+        lines.extend(self._table_lines(zip(machines, matrix)))
+
+        # The geometric mean of a normalized row is the ratio between the
+        # geometric means of the raw rows, so these are only computed once
+        raw_means = tuple(map(geo_mean, matrix))
+
+        # The adjective used in the conclusions
+        adj = "fast" if self.type == "LIB" else "powerful"
 
         # Now we print the normalized versions
-        for ref_machine in self.data.keys():
+        for ref, ref_machine in enumerate(machines):
             # Section header
-            writer(f"\n## With computer {ref_machine} as reference\n")
+            lines.append(f"\n## With computer {ref_machine} as reference\n")
             # Subtitle
-            writer("The normalized data looks like this\n")
+            lines.append("The normalized data looks like this\n")
 
             # Print table
-            compared_to_ref_machine = self.compared_to(ref_machine)
-            self.print_table(compared_to_ref_machine, output)
+            normalized = self._normalized(matrix[ref], matrix)
+            lines.extend(self._table_lines(zip(machines, normalized)))
 
             # Write conclusions and summary
-            writer("\nIf we order their geometric means in increasing " +
-                   "order, we have that:\n")
+            lines.append("\nIf we order their geometric means in " +
+                         "increasing order, we have that:\n")
 
             # Sort results
-            geo_means = {
-                comp: geo_mean(normals)
-                for comp, normals in compared_to_ref_machine.items()
-            }
-            geo_means = sorted(geo_means.items(), key=operator.itemgetter(1))
+            ref_mean = raw_means[ref]
+            if self.type == "LIB":
+                geo_means = ((comp, ref_mean / mean)
+                             for comp, mean in zip(machines, raw_means))
+            else:
+                geo_means = ((comp, mean / ref_mean)
+                             for comp, mean in zip(machines, raw_means))
+            geo_means = sorted(geo_means, key=operator.itemgetter(1))
 
             # Print results
-            results = []
-            for computer, mean in geo_means:
-                if computer != ref_machine:
-                    adj = "fast" if self.type == "LIB" else "powerful"
-                    result = (f"- Computer {computer} is {mean:.2f} times" +
-                              f" as {adj} as computer {ref_machine}.")
-                    results.append(result)
-            writer(str.join('\n', results))
+            results = [
+                f"- Computer {computer} is {mean:.2f} times" +
+                f" as {adj} as computer {ref_machine}."
+                for computer, mean in geo_means if computer != ref_machine
+            ]
+            lines.append(str.join('\n', results))
+
+        # Set output to either stdout or the output file if there is one
+        stream = output if output else sys.stdout
+        stream.write(str.join('\n', lines) + "\n")
 
     @staticmethod
     def new_data_set(title: Optional[str] = None) -> tuple:
@@ -200,8 +262,10 @@ class BenchmarkTable:
         data = {}
         num_machines = int(
             input("How many computers did you run your tests on?: "))
-        for i in range(num_machines):
-            letter = chr(i + 65)
+        if not 0 < num_machines <= len(ascii_uppercase):
+            error("The number of computers must be between 1 and " +
+                  f"{len(ascii_uppercase)}")
+        for letter in ascii_uppercase[:num_machines]:
             data[letter] = [
                 float(input(f"Machine {letter}'s result in test {test}: "))
                 for test in headers[1:]
@@ -218,13 +282,12 @@ class BenchmarkTable:
                 A data set of the form (title, headers, data, data_type).
         """
         _, headers, data, data_type = data_set
-        first = list(data.keys())[0]
-        if len(headers) - 1 != len(data[first]):
+        expected = len(data[next(iter(data))])
+        if len(headers) - 1 != expected:
             error("Column headers and data set don't match")
-        for v in data.values():
-            if len(v) != len(data[first]):
-                error("Rows don't have the same number of data points")
-        if not data_type == "LIB" and not data_type == "HIB":
+        if not all(len(v) == expected for v in data.values()):
+            error("Rows don't have the same number of data points")
+        if data_type not in {"LIB", "HIB"}:
             error(f"Invalid data type {data_type}. Must be either LIB or HIB")
 
 
@@ -238,29 +301,13 @@ def create_pdf(f_name: str):
 
     pandoc = which("pandoc")
     if pandoc:
-        name, _ = f_name.split('.', 1)
+        name = os.path.splitext(f_name)[0]
         pdf = f"pandoc {f_name} -o {name}.pdf"
         subprocess.call(pdf.split(' '))
     else:
         error("pandoc is not installed, unable to create pdf")
 
 
-def compose(*functions):
-    """Function composition
-
-    Args:
-        functions: the functions to be composed.
-
-    Returns:
-        the composed function.
-    """
-
-    def compose2(f, g):
-        return lambda x: f(g(x))
-
-    return functools.reduce(compose2, functions, lambda x: x)
-
-
 def error(message: str):
     """Prints a descriptive message, then exits the program with exit code 1.
 
@@ -274,10 +321,21 @@ def error(message: str):
 def geo_mean(data: List[float]):
     """Gets the geometric mean of a list of floats.
 
+    The product of the data is used directly when it is well within the
+    range of a float, otherwise the mean is computed in log space so that
+    it can't overflow or lose precision. If any value is zero the mean is
+    0.0.
+
     Args:
         data: the list of floats.
     """
-    return math.pow(functools.reduce(operator.mul, data), 1 / len(data))
+    # Zero has no logarithm, but it makes the whole product zero
+    if 0 in data:
+        return 0.0
+    product = math.prod(data)
+    if 1e-150 < product < 1e150:
+        return product ** (1 / len(data))
+    return math.exp(math.fsum(math.log(x) for x in data) / len(data))
 
 
 def valid_file(ctx, param, value):
@@ -322,22 +380,7 @@ def which(program):
     Returns:
         The program's path or None if it doesn't find it.
     """
-    import os
-
-    def is_exe(a_file_path):
-        return os.path.isfile(a_file_path) and os.access(a_file_path, os.X_OK)
-
-    file_path, _ = os.path.split(program)
-    if file_path:
-        if is_exe(program):
-            return program
-    else:
-        for path in os.environ["PATH"].split(os.pathsep):
-            exe_file = os.path.join(path, program)
-            if is_exe(exe_file):
-                return exe_file
-
-    return None
+    return shutil.which(program)
 
 
 @click.command()